@@ -1,5 +1,7 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+from typing import Any
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 import pandas as pd
 import numpy as np
 import torch
@@ -7,23 +9,39 @@ import torch.nn as nn
 from joblib import load
 import json
 
-app = FastAPI()
-
-# 사용자 입력 데이터 모델
-class UserInfo(BaseModel):
-    username: str
-    current_weight: float
-    target_weight: float
-    height: float
-    age: int
-    gender: str
-    activity_level: int  # 1~5 사이 값
-    goal_type: str  # 저지방 고단백, 균형 식단, 벌크업
-    preferred_body_part: str  # 선호 운동 부위
-    bmr: float
-    tdee: float
-    bmi: float
-    target_bmi: float
+try:
+    from .optimized_inference import prepare_model
+    from .request_profiler import RequestProfiler
+    from .user_schema import PREDICT_FIELDS, UserInfoValidationError, user_profile_json_schema, validate_user_info
+except ImportError:
+    from optimized_inference import prepare_model
+    from request_profiler import RequestProfiler
+    from user_schema import PREDICT_FIELDS, UserInfoValidationError, user_profile_json_schema, validate_user_info
+
+# 빠른 JSON 인코더 (orjson 설치 시 응답 직렬화에 사용)
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    app = FastAPI(default_response_class=ORJSONResponse)
+except ImportError:
+    app = FastAPI()
+
+# 사용자 입력 문서화 (공용 스키마에서 생성한 JSON Schema, OpenAPI 문서 전용)
+# 요청 본문은 그대로 받아 validate_user_info 로만 검증 (CLI 와 같은 규칙/오류 형식)
+user_info_openapi = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": user_profile_json_schema(PREDICT_FIELDS)}},
+    }
+}
+
+# 본문 파싱 실패(잘못된 JSON 등)도 validate_user_info 와 같은 {"field", "message"} 형식으로 반환
+@app.exception_handler(RequestValidationError)
+def request_validation_error(request, exc):
+    return JSONResponse(status_code=422, content={"detail": [
+        {"field": ".".join(part for part in error["loc"][1:] if isinstance(part, str)) or "body", "message": error["msg"]}
+        for error in exc.errors()
+    ]})
 
 # 모델 및 스케일러 로드
 feature_path = "./src/python/Data/feature_columns.json"
@@ -59,48 +77,68 @@ model = FeedforwardNNImproved(input_dim, hidden_layer_sizes)
 model.load_state_dict(torch.load(model_path))
 model.eval()
 
-@app.post("/predict")
-def predict_goal_duration(user_info: UserInfo):
-    # 입력 데이터 처리
-    input_data = pd.DataFrame([{
-        "Age": user_info.age,
-        "Height": user_info.height / 100,  # cm → m
-        "Weight": user_info.current_weight,
-        "TargetWeight": user_info.target_weight,
-        "BMR": user_info.bmr,
-        "TDEE": user_info.tdee,
-        "BMI": user_info.bmi,
-        "TargetBMI": user_info.target_bmi,
-        "Calorie_Target": user_info.tdee - 500,  # 예시 칼로리 목표
-        "Calorie_Deficit": 500,
-        "총 운동시간": 120,
-        "하루소모칼로리": 400,
-        "총 식사섭취 칼로리": 2000,
-        "ActivityLevel": user_info.activity_level,
-        "Gender": user_info.gender,
-        "GoalType": user_info.goal_type,
-        "preferred_body_part": user_info.preferred_body_part
-    }])
-
-    # 범주형 변수 처리
-    categorical_features = ['Gender', 'GoalType', 'preferred_body_part']
-    input_data = pd.get_dummies(input_data, columns=categorical_features)
-
-    # 누락된 열 추가 및 정렬
-    input_data = input_data.reindex(columns=expected_columns, fill_value=0)
-
-    # 데이터 스케일링
-    X_input = scaler.transform(input_data)
-
-    # 모델 예측
-    with torch.no_grad():
-        X_tensor = torch.tensor(X_input, dtype=torch.float32)
-        prediction = model(X_tensor).item()
-        days_to_goal = np.expm1(prediction)  # 로그 변환 복원
+# 추론 모드 설정 (PREDICT_OPTIMIZED / PREDICT_NUM_THREADS / PREDICT_NUM_INTEROP_THREADS)
+model = prepare_model(model, input_dim, model_path)
+
+# 느린 요청 프로파일링 (PROFILE_SLOW_MS 설정 시 활성화)
+profiler = RequestProfiler.from_env("predict")
+
+@app.post("/predict", openapi_extra=user_info_openapi)
+def predict_goal_duration(payload: Any = Body(...)):
+    with profiler.profile(input_size={"rows": 1, "fields": len(PREDICT_FIELDS)}) as trace:
+        with trace.stage("validate"):
+            # 사용자 입력 검증 (model_predict / foodRecommendation 과 같은 공용 스키마)
+            try:
+                user_info = validate_user_info(payload, PREDICT_FIELDS)
+            except UserInfoValidationError as e:
+                raise HTTPException(
+                    status_code=422,
+                    detail=[{"field": field, "message": message} for field, message in e.errors]
+                )
+
+        with trace.stage("preprocess"):
+            # 입력 데이터 처리
+            input_data = pd.DataFrame([{
+                "Age": user_info["age"],
+                "Height": user_info["height"] / 100,  # cm → m
+                "Weight": user_info["current_weight"],
+                "TargetWeight": user_info["target_weight"],
+                "BMR": user_info["bmr"],
+                "TDEE": user_info["tdee"],
+                "BMI": user_info["bmi"],
+                "TargetBMI": user_info["target_bmi"],
+                "Calorie_Target": user_info["tdee"] - 500,  # 예시 칼로리 목표
+                "Calorie_Deficit": 500,
+                "총 운동시간": 120,
+                "하루소모칼로리": 400,
+                "총 식사섭취 칼로리": 2000,
+                "ActivityLevel": user_info["activity_level"],
+                "Gender": user_info["gender"],
+                "GoalType": user_info["goal_type"],
+                "preferred_body_part": user_info["preferred_body_part"]
+            }])
+
+            # 범주형 변수 처리
+            categorical_features = ['Gender', 'GoalType', 'preferred_body_part']
+            input_data = pd.get_dummies(input_data, columns=categorical_features)
+
+            # 누락된 열 추가 및 정렬
+            input_data = input_data.reindex(columns=expected_columns, fill_value=0)
+
+        with trace.stage("scale"):
+            # 데이터 스케일링
+            X_input = scaler.transform(input_data)
+
+        with trace.stage("inference"):
+            # 모델 예측
+            with torch.no_grad():
+                X_tensor = torch.tensor(X_input, dtype=torch.float32)
+                prediction = model(X_tensor).item()
+                days_to_goal = np.expm1(prediction)  # 로그 변환 복원
 
     # 결과 반환
     return {
-        "username": user_info.username,
+        "username": user_info["username"],
         "days_to_goal": round(days_to_goal, 2),  # 목표 달성 예상 기간 (일수)
-        "message": f"{user_info.username}님의 목표 달성까지 예상 소요 기간은 약 {round(days_to_goal, 2)}일입니다."
+        "message": f"{user_info['username']}님의 목표 달성까지 예상 소요 기간은 약 {round(days_to_goal, 2)}일입니다."
     }
\ No newline at end of file
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+예측 모델 float / 최적화 추론 비교 스크립트
+
+최적화 후보
+    frozen: TorchScript trace + freeze (float, 예측값 동일)
+    int8  : Linear int8 동적 양자화 + TorchScript trace + freeze
+
+- 정확도: Data/gender.csv 기반 held-out 세트에서 float 모델 대비 예측 오차,
+  평균 상대 오차가 --max-relative-error 이하인 후보만 허용
+- 처리량: 스레드 수별 단건/배치 처리량 및 코어당 처리량
+- --save-optimized: 허용된 후보 중 int8 우선으로 Data/P_model_optimized.pt 에 저장 (PREDICT_OPTIMIZED=1 에서 로드),
+  저장 후 다시 로드한 모델로 측정하므로 리포트가 배포되는 모델 기준이 됨
+
+실행 (src/python 디렉토리에서):
+    python benchmark_inference.py --threads 1 2 4 --save-optimized --output Data/inference_report.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import torch
+
+from model_predict import (
+    FeedforwardNNImproved, build_features, hidden_layer_sizes, input_dim, model_path
+)
+from optimized_inference import load_optimized_model, optimize_model, save_optimized_model
+from profile_samples import load_people, people_path, synthetic_profiles
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+def build_holdout(path=people_path, holdout_ratio=0.2, seed=42):
+    """
+    gender.csv 신체 정보로 예측 입력 행을 만들고 held-out 비율만큼 반환
+    - 활동 수준 / 목표 식단 / 선호 부위 / 목표 체중은 고정 seed 로 샘플링
+    """
+    rng = np.random.default_rng(seed)
+    people = load_people(path).sample(frac=1.0, random_state=seed).reset_index(drop=True)
+    people = people.iloc[int(len(people) * (1 - holdout_ratio)):].reset_index(drop=True)
+    return torch.tensor(build_features(synthetic_profiles(people, rng)), dtype=torch.float32)
+
+def load_float_model():
+    model = FeedforwardNNImproved(input_dim, hidden_layer_sizes)
+    model.load_state_dict(torch.load(model_path))
+    model.eval()
+    return model
+
+def accuracy_report(float_model, optimized_model, X):
+    """
+    float 모델 대비 최적화 모델 예측 오차 (로그 공간 / 일수)
+    """
+    with torch.no_grad():
+        log_float = float_model(X).squeeze(1).numpy()
+        log_opt = optimized_model(X).squeeze(1).numpy()
+    days_float = np.expm1(log_float)
+    days_opt = np.expm1(log_opt)
+    abs_err = np.abs(days_opt - days_float)
+
+    return {
+        "rows": int(len(X)),
+        "log_mae": round(float(np.mean(np.abs(log_opt - log_float))), 6),
+        "days_mae": round(float(np.mean(abs_err)), 4),
+        "days_max_abs_error": round(float(np.max(abs_err)), 4),
+        "days_mean_relative_error": round(float(np.mean(abs_err / np.maximum(np.abs(days_float), 1e-6))), 6),
+        # API 응답은 소수점 2자리로 반올림되므로 반올림 결과가 같은 비율도 함께 기록
+        "rounded_match_ratio": round(float(np.mean(np.round(days_opt, 2) == np.round(days_float, 2))), 4),
+    }
+
+def measure_throughput(model, X, num_threads, batch_size, min_seconds=1.0):
+    """
+    주어진 스레드 수에서 초당 처리 행 수 측정
+    """
+    torch.set_num_threads(num_threads)
+    batch = X[:batch_size] if batch_size <= len(X) else X.repeat(batch_size // len(X) + 1, 1)[:batch_size]
+
+    with torch.no_grad():
+        for _ in range(10):  # warm-up
+            model(batch)
+        iterations = 0
+        start = time.perf_counter()
+        while True:
+            model(batch)
+            iterations += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+
+    rows_per_sec = iterations * batch_size / elapsed
+    return {
+        "rows_per_sec": round(rows_per_sec, 1),
+        "rows_per_sec_per_core": round(rows_per_sec / num_threads, 1),
+        "latency_ms": round(elapsed / iterations * 1000, 4),
+    }
+
+def throughput_report(models, X, thread_counts, batch_sizes):
+    """
+    models: {이름: 모델}, 첫 번째 모델(float) 대비 속도 향상 비율 포함
+    """
+    baseline = next(iter(models))
+    report = []
+    for num_threads in thread_counts:
+        for batch_size in batch_sizes:
+            entry = {"threads": num_threads, "batch_size": batch_size}
+            for name, model in models.items():
+                entry[name] = measure_throughput(model, X, num_threads, batch_size)
+            entry["speedup"] = {
+                name: round(entry[name]["rows_per_sec"] / entry[baseline]["rows_per_sec"], 2)
+                for name in models if name != baseline
+            }
+            report.append(entry)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="float vs 최적화 추론 정확도/처리량 비교")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--holdout-ratio", type=float, default=0.2)
+    parser.add_argument("--max-relative-error", type=float, default=0.01,
+                        help="최적화 후보 허용 기준 (float 대비 일수 평균 상대 오차)")
+    parser.add_argument("--save-optimized", action="store_true", help="허용된 최적화 모델을 저장하고 저장된 모델로 측정")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    thread_counts = [t for t in args.threads if t <= (os.cpu_count() or 1)]
+
+    X = build_holdout(holdout_ratio=args.holdout_ratio)
+    float_model = load_float_model()
+    candidates = {
+        "int8": optimize_model(load_float_model(), input_dim, quantize=True),
+        "frozen": optimize_model(load_float_model(), input_dim, quantize=False),
+    }
+    accuracy = {name: accuracy_report(float_model, model, X) for name, model in candidates.items()}
+    for name in accuracy:
+        accuracy[name]["accepted"] = accuracy[name]["days_mean_relative_error"] <= args.max_relative_error
+
+    saved = None
+    if args.save_optimized:
+        # int8 이 정확도 기준을 통과하지 못하면 예측값이 동일한 frozen 모델 저장
+        variant = "int8" if accuracy["int8"]["accepted"] else "frozen"
+        path = save_optimized_model(candidates[variant], model_path)
+        candidates[variant] = load_optimized_model(model_path, path)
+        saved = {"variant": variant, "path": path}
+
+    result = {
+        "torch_version": torch.__version__,
+        "cpu_count": os.cpu_count(),
+        "max_relative_error": args.max_relative_error,
+        "saved_optimized_model": saved,
+        "accuracy": accuracy,
+        "throughput": throughput_report({"float": float_model, **candidates}, X, thread_counts, args.batch_sizes),
+    }
+
+    print(json.dumps(result, ensure_ascii=False, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
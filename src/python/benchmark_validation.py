@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+사용자 입력 검증 비용 비교 (행 단위 validate_user_info vs 컬럼 단위 validate_user_batch)
+
+Data/gender.csv 신체 정보를 반복/샘플링해 대량 배치를 만들고 행당 검증 비용(µs)을 측정
+
+실행 (src/python 디렉토리에서):
+    python benchmark_validation.py --rows 1000 10000 100000
+"""
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from profile_samples import people_path, sample_people, synthetic_profiles
+from user_schema import PREDICT_FIELDS, UserInfoValidationError, validate_user_batch, validate_user_info
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+def build_batch(n_rows, invalid_ratio=0.0, path=people_path, seed=42):
+    """
+    n_rows 크기의 예측 입력 배치(DataFrame) 생성, invalid_ratio 만큼 activity_level 을 범위 밖으로 설정
+    """
+    rng = np.random.default_rng(seed)
+    frame = synthetic_profiles(sample_people(n_rows, rng, path), rng)
+    frame.loc[rng.random(n_rows) < invalid_ratio, "activity_level"] = 5
+    return frame
+
+def time_per_row(func, n_rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best / n_rows * 1e6, 3)
+
+def validate_rows(records):
+    invalid = 0
+    for record in records:
+        try:
+            validate_user_info(record, PREDICT_FIELDS)
+        except UserInfoValidationError:
+            invalid += 1
+    return invalid
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="행 단위 vs 컬럼 단위 입력 검증 비용 비교")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = []
+    for n_rows in args.rows:
+        frame = build_batch(n_rows, args.invalid_ratio)
+        records = frame.to_dict(orient="records")
+
+        # 두 경로가 같은 행을 잘못된 행으로 판단하는지 확인
+        _, errors = validate_user_batch(frame, PREDICT_FIELDS)
+        batch_invalid = len(np.unique(np.concatenate(list(errors.values())))) if errors else 0
+        row_invalid = validate_rows(records)
+
+        per_row_us = time_per_row(lambda: validate_rows(records), n_rows, args.repeat)
+        batch_us = time_per_row(lambda: validate_user_batch(frame, PREDICT_FIELDS), n_rows, args.repeat)
+        report.append({
+            "rows": n_rows,
+            "invalid_rows": {"per_row": row_invalid, "batch": batch_invalid},
+            "per_row_us": per_row_us,
+            "batch_us_per_row": batch_us,
+            "speedup": round(per_row_us / batch_us, 1),
+        })
+
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
@@ -1,10 +1,21 @@
 import os
 import sys
 import json
+import multiprocessing
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from request_profiler import RequestProfiler
+from health_utils import calculate_bmi, calculate_bmr, calculate_tdee
+from shared_catalog import SharedCatalogReader, build_catalog, default_catalog_dir, publish_catalog
+from user_schema import DIET_FIELDS, UserInfoValidationError, validate_user_info
+
+# 빠른 JSON 인코더 (설치되어 있으면 사용)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 환경 변수 로드
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,50 +25,55 @@ load_dotenv(env_path)
 # DB 연결 정보
 DB_CONFIG = {
     'host': os.getenv('DB_HOST'),
-    'port': int(os.getenv('DB_PORT')),
+    'port': int(os.getenv('DB_PORT', '3306')),
     'user': os.getenv('DB_USER'),
     'password': os.getenv('DB_PASSWORD'),
     'database': os.getenv('DB_NAME')
 }
 
-try:
-    # SQLAlchemy engine 생성
-    database_url = f"mysql+mysqlconnector://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?charset=utf8mb4"
-    engine = create_engine(database_url)
-    
-    with engine.connect() as connection:
-        # 음식 데이터 가져오기
-        query = text("""
-            SELECT 
-                name,
-                category,
-                calories,
-                carbs,
-                protein,
-                fat,
-                serving_size
-            FROM foods
-        """)
-        
-        food_data = pd.read_sql_query(query, connection)
-        
-        # 컬럼 매핑 (영어 -> 한글)
-        column_mapping = {
-            'name': '식품명',
-            'category': '식품대분류명',
-            'calories': '에너지(kcal)',
-            'carbs': '탄수화물(g)',
-            'protein': '단백질(g)',
-            'fat': '지방(g)',
-            'serving_size': '식품중량'
-        }
-        food_data = food_data.rename(columns=column_mapping)
-        print("Successfully loaded data from database", file=sys.stderr)
+def load_food_data():
+    """
+    DB 에서 음식 데이터 조회 (컬럼명은 한글로 매핑)
+    """
+    try:
+        # SQLAlchemy engine 생성 (DATABASE_URL 이 있으면 우선 사용, 예: 부하 테스트용 sqlite:///...)
+        database_url = os.getenv('DATABASE_URL') or f"mysql+mysqlconnector://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?charset=utf8mb4"
+        engine = create_engine(database_url)
+
+        with engine.connect() as connection:
+            # 음식 데이터 가져오기
+            query = text("""
+                SELECT 
+                    name,
+                    category,
+                    calories,
+                    carbs,
+                    protein,
+                    fat,
+                    serving_size
+                FROM foods
+            """)
+
+            food_data = pd.read_sql_query(query, connection)
+
+            # 컬럼 매핑 (영어 -> 한글)
+            column_mapping = {
+                'name': '식품명',
+                'category': '식품대분류명',
+                'calories': '에너지(kcal)',
+                'carbs': '탄수화물(g)',
+                'protein': '단백질(g)',
+                'fat': '지방(g)',
+                'serving_size': '식품중량'
+            }
+            food_data = food_data.rename(columns=column_mapping)
+            print("Successfully loaded data from database", file=sys.stderr)
+            return food_data
+
+    except Exception as e:
+        print(f"Error connecting to database: {str(e)}", file=sys.stderr)
+        sys.exit(1)
 
-except Exception as e:
-    print(f"Error connecting to database: {str(e)}", file=sys.stderr)
-    sys.exit(1)
-    
 # 음식 분류 함수
 def classify_food(row):
     """
@@ -80,53 +96,64 @@ def classify_food(row):
     else:
         return "기타"
 
-# 음식 분류 열 추가
-food_data['음식분류'] = food_data.apply(classify_food, axis=1)
-
-# BMI 계산 함수
-def calculate_bmi(weight, height):
+def load_catalog():
     """
-    BMI 계산 및 상태 반환
+    DB 조회 + 음식 분류 후 카탈로그 배열 생성
     """
-    bmi = weight / ((height / 100) ** 2)  # 키를 cm에서 m로 변환하여 계산
-    if bmi < 18.5:
-        return '저체중', bmi
-    elif 18.5 <= bmi < 23:
-        return '정상체중', bmi
-    elif 23 <= bmi < 25:
-        return '과체중', bmi
-    else:
-        return '비만', bmi
+    food_data = load_food_data()
+    food_data['음식분류'] = food_data.apply(classify_food, axis=1)
+    return build_catalog(food_data.reset_index(drop=True))
+
+# 카탈로그 로드: FOOD_CATALOG_DIR 가 설정되면 게시된 공유 카탈로그에 attach, 아니면 DB 에서 직접 로드
+catalog_dir = os.getenv('FOOD_CATALOG_DIR')
+shared_catalog = None
+if catalog_dir:
+    try:
+        shared_catalog = SharedCatalogReader(catalog_dir)
+        catalog = shared_catalog.catalog
+    except FileNotFoundError as e:
+        # 아직 게시되지 않은 경우 요청 실패 대신 DB 에서 직접 로드
+        sys.stderr.write(f"{e}; loading food catalog from database\n")
+if shared_catalog is None:
+    catalog = load_catalog()
 
-# BMR 계산 함수 (Harris-Benedict 공식)
-def calculate_bmr(weight, height, age, gender):
+def get_catalog():
     """
-    BMR(기초대사량) 계산
+    현재 카탈로그 반환 (공유 카탈로그는 새 세대가 게시되었으면 교체)
     """
-    if gender == 'Male':
-        return 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
-    elif gender == 'Female':
-        return 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
-    else:
-        raise ValueError("성별은 'Male' 또는 'Female'로 입력해야 합니다.")
+    if shared_catalog is not None:
+        return shared_catalog.current()
+    return catalog
 
-# TDEE 계산 함수
-def calculate_tdee(bmr, activity_level):
+# 결과 레코드 키 순서 (macro_density 열 순서와 동일)
+record_keys = ["portion", "carb", "protein", "fat", "calories"]
+
+def build_records(catalog, food_indices, calorie_budgets):
     """
-    TDEE(Total Daily Energy Expenditure) 계산 함수
+    선택된 음식들의 섭취량/영양소를 한 번의 벡터 연산으로 계산하여 레코드 리스트로 반환
     """
-    activity_level_mapping = {
-        1: 1.2,
-        2: 1.375,
-        3: 1.55,
-        4: 1.725,
-    }
+    food_indices = np.asarray(food_indices, dtype=np.intp)
+    with np.errstate(invalid='ignore'):
+        table = np.round(np.asarray(calorie_budgets, dtype=np.float64)[:, None] * catalog['macro_density'][food_indices], 2)
+    return [
+        {"food_name": name, **dict(zip(record_keys, values))}
+        for name, values in zip(catalog['names'][food_indices].tolist(), table.tolist())
+    ]
 
-    if activity_level not in activity_level_mapping:
-        raise ValueError("활동 수준은 1~4 사이의 정수여야 합니다.")
+def pick_top_food(candidates, score, top_n=5):
+    """
+    후보 중 점수가 낮은 상위 top_n 개에서 랜덤 선택하여 음식 위치 인덱스 반환
+    """
+    top = candidates[np.argsort(score, kind='stable')[:top_n]]
+    return int(np.random.choice(top))
 
-    activity_coefficient = activity_level_mapping[activity_level]
-    return bmr * activity_coefficient
+def dumps_json(obj):
+    """
+    JSON 직렬화 (orjson 이 있으면 사용, 없으면 표준 json)
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
 
 # 목표별 영양소 비율 설정
 goal_ratios = {
@@ -136,13 +163,19 @@ goal_ratios = {
 }
 
 # 식단 추천 함수 (식품별 섭취량 계산 포함)
-def recommend_diet(calorie_target, food_data, carb_target, protein_target, fat_target):
+def recommend_diet(calorie_target, catalog, carb_target, protein_target, fat_target):
     """
     식단 추천: 목표 영양소 비율에 맞는 섭취량을 계산하여 반환
+    - 음식 선택 후 섭취량/영양소는 macro_density 로 한 번에 계산
     """
     meal_ratios = {"breakfast": 0.3, "lunch": 0.35, "snack": 0.15, "dinner": 0.2}
     recommended_meals = {}
     used_foods = []  # 이미 선택된 음식을 저장하는 리스트
+    selections = []  # (meal, slot, 음식 위치 인덱스, 칼로리 예산)
+
+    names = catalog['names']
+    category = catalog['category']
+    carbs, protein, fat = catalog['carbs'], catalog['protein'], catalog['fat']
 
     for meal, ratio in meal_ratios.items():
         meal_calories = calorie_target * ratio
@@ -152,71 +185,53 @@ def recommend_diet(calorie_target, food_data, carb_target, protein_target, fat_t
 
         if meal == "snack":
             # 간식은 디저트류나 브런치류에서 선택
-            snack_food = food_data[food_data['음식분류'].isin(['디저트류', '브런치류'])]
-            if not snack_food.empty:
-                snack_food = snack_food.copy()
-                snack_food['score'] = np.abs(snack_food['탄수화물(g)'] - meal_carb_target) + \
-                                       np.abs(snack_food['단백질(g)'] - meal_protein_target) + \
-                                       np.abs(snack_food['지방(g)'] - meal_fat_target)
+            snack_food = np.flatnonzero(np.isin(category, ['디저트류', '브런치류']))
+            if snack_food.size:
+                score = np.abs(carbs[snack_food] - meal_carb_target) + \
+                        np.abs(protein[snack_food] - meal_protein_target) + \
+                        np.abs(fat[snack_food] - meal_fat_target)
                 # 상위 5개 음식 중 랜덤 선택
-                selected_food = snack_food.sort_values('score').head(5).sample(1).iloc[0]
-                portion = meal_calories / selected_food['에너지(kcal)'] * 100
-                recommended_meals[meal] = {
-                    "food_name": selected_food['식품명'],
-                    "portion": round(portion, 2),
-                    "carb": round(selected_food['탄수화물(g)'] * (portion / 100), 2),
-                    "protein": round(selected_food['단백질(g)'] * (portion / 100), 2),
-                    "fat": round(selected_food['지방(g)'] * (portion / 100), 2),
-                    "calories": round(selected_food['에너지(kcal)'] * (portion / 100), 2)
-                }
-                used_foods.append(selected_food['식품명'])
+                selected_idx = pick_top_food(snack_food, score)
+                selections.append((meal, None, selected_idx, meal_calories))
+                used_foods.append(names[selected_idx])
             else:
                 recommended_meals[meal] = {"message": "No suitable snack found"}
         else:
             # 일반 식사는 밥류와 반찬류 조합
-            rice_food = food_data[(food_data['음식분류'] == '밥류') & (~food_data['식품명'].isin(used_foods))]
-            side_dish = food_data[(food_data['음식분류'] == '반찬류') & (~food_data['식품명'].isin(used_foods))]
+            unused = ~np.isin(names, np.array(used_foods, dtype=names.dtype))
+            rice_food = np.flatnonzero((category == '밥류') & unused)
+            side_dish = np.flatnonzero((category == '반찬류') & unused)
 
-            if not rice_food.empty and not side_dish.empty:
+            if rice_food.size and side_dish.size:
                 # 밥류 선택
-                rice_food = rice_food.copy()
-                rice_food['score'] = np.abs(rice_food['탄수화물(g)'] - meal_carb_target * 0.6) + \
-                                     np.abs(rice_food['단백질(g)'] - meal_protein_target * 0.4)
-                rice = rice_food.sort_values('score').head(5).sample(1).iloc[0]
+                rice_score = np.abs(carbs[rice_food] - meal_carb_target * 0.6) + \
+                             np.abs(protein[rice_food] - meal_protein_target * 0.4)
+                rice_idx = pick_top_food(rice_food, rice_score)
 
                 # 반찬류 선택
-                side_dish = side_dish.copy()
-                side_dish['score'] = np.abs(side_dish['단백질(g)'] - meal_protein_target * 0.6) + \
-                                     np.abs(side_dish['지방(g)'] - meal_fat_target * 0.4)
-                side = side_dish.sort_values('score').head(5).sample(1).iloc[0]
-
-                rice_portion = meal_calories * 0.6 / rice['에너지(kcal)'] * 100
-                side_portion = meal_calories * 0.4 / side['에너지(kcal)'] * 100
-
-                recommended_meals[meal] = {
-                    "rice": {
-                        "food_name": rice['식품명'],
-                        "portion": round(rice_portion, 2),
-                        "carb": round(rice['탄수화물(g)'] * (rice_portion / 100), 2),
-                        "protein": round(rice['단백질(g)'] * (rice_portion / 100), 2),
-                        "fat": round(rice['지방(g)'] * (rice_portion / 100), 2),
-                        "calories": round(rice['에너지(kcal)'] * (rice_portion / 100), 2)
-                    },
-                    "side_dish": {
-                        "food_name": side['식품명'],
-                        "portion": round(side_portion, 2),
-                        "carb": round(side['탄수화물(g)'] * (side_portion / 100), 2),
-                        "protein": round(side['단백질(g)'] * (side_portion / 100), 2),
-                        "fat": round(side['지방(g)'] * (side_portion / 100), 2),
-                        "calories": round(side['에너지(kcal)'] * (side_portion / 100), 2)
-                    }
-                }
-                used_foods.append(rice['식품명'])
-                used_foods.append(side['식품명'])
+                side_score = np.abs(protein[side_dish] - meal_protein_target * 0.6) + \
+                             np.abs(fat[side_dish] - meal_fat_target * 0.4)
+                side_idx = pick_top_food(side_dish, side_score)
+
+                selections.append((meal, "rice", rice_idx, meal_calories * 0.6))
+                selections.append((meal, "side_dish", side_idx, meal_calories * 0.4))
+                recommended_meals[meal] = {}
+                used_foods.append(names[rice_idx])
+                used_foods.append(names[side_idx])
             else:
                 recommended_meals[meal] = {"message": f"No suitable food found for {meal}"}
 
-    return recommended_meals
+    # 선택된 음식 전체의 섭취량/영양소를 한 번에 계산
+    if selections:
+        records = build_records(catalog, [s[2] for s in selections], [s[3] for s in selections])
+        for (meal, slot, _, _), record in zip(selections, records):
+            if slot is None:
+                recommended_meals[meal] = record
+            else:
+                recommended_meals[meal][slot] = record
+
+    # 식사 순서 유지
+    return {meal: recommended_meals[meal] for meal in meal_ratios}
 
 # BMI 상태에 따른 TDEE 조정
 def adjust_tdee_based_on_bmi(tdee, bmi_status):
@@ -235,48 +250,56 @@ def adjust_tdee_based_on_bmi(tdee, bmi_status):
         return tdee * 0.8  # 20% 감소
     return tdee  # 정상체중은 조정 없음
 
+# 느린 요청 프로파일링 (PROFILE_SLOW_MS 설정 시 활성화)
+profiler = RequestProfiler.from_env("diet")
+
 # 사용자 맞춤 식단 추천
 def get_custom_diet(user_info):
     """
     사용자 정보 기반 맞춤 식단 추천
     """
     try:
-        # 문자열 데이터를 float 또는 int로 변환
-        current_weight = float(user_info['current_weight'])
-        target_weight = float(user_info['target_weight'])
-        height = float(user_info['height'])
-        age = int(user_info['age'])
-        gender = user_info['gender']
-        activity_level = int(user_info['activity_level'])
-        goal_type = user_info['goal_type']  # 목표 식단 추가
-
-        # 현재 BMI 계산
-        bmi_status, current_bmi = calculate_bmi(current_weight, height)
+        catalog = get_catalog()
+        with profiler.profile(input_size={"foods": len(catalog['names'])}) as trace:
+            with trace.stage("targets"):
+                # 공용 스키마로 검증 및 타입 변환 (문자열 숫자 허용)
+                values = validate_user_info(user_info, DIET_FIELDS)
+                current_weight = values['current_weight']
+                target_weight = values['target_weight']
+                height = values['height']
+                age = values['age']
+                gender = values['gender']
+                activity_level = values['activity_level']
+                goal_type = values['goal_type']  # 목표 식단 추가
+
+                # 현재 BMI 계산
+                bmi_status, current_bmi = calculate_bmi(current_weight, height)
         
-        # 현재와 목표 BMR 및 TDEE 계산
-        current_bmr = calculate_bmr(current_weight, height, age, gender)
-        current_tdee = calculate_tdee(current_bmr, activity_level)
+                # 현재와 목표 BMR 및 TDEE 계산
+                current_bmr = calculate_bmr(current_weight, height, age, gender)
+                current_tdee = calculate_tdee(current_bmr, activity_level)
 
-        target_bmr = calculate_bmr(target_weight, height, age, gender)
-        target_tdee = calculate_tdee(target_bmr, activity_level)
+                target_bmr = calculate_bmr(target_weight, height, age, gender)
+                target_tdee = calculate_tdee(target_bmr, activity_level)
 
-        # BMI 상태에 따라 TDEE 조정 (덮어쓰기)
-        current_tdee = adjust_tdee_based_on_bmi(current_tdee, bmi_status)
-        target_tdee = adjust_tdee_based_on_bmi(target_tdee, bmi_status)
+                # BMI 상태에 따라 TDEE 조정 (덮어쓰기)
+                current_tdee = adjust_tdee_based_on_bmi(current_tdee, bmi_status)
+                target_tdee = adjust_tdee_based_on_bmi(target_tdee, bmi_status)
 
-        # 목표 식단의 영양소 비율 가져오기
-        if goal_type not in goal_ratios:
-            raise ValueError(f"'{goal_type}'은 유효하지 않은 목표 식단 타입입니다.")
-        ratios = goal_ratios[goal_type]
-        carb_ratio, protein_ratio, fat_ratio = ratios["carb_ratio"], ratios["protein_ratio"], ratios["fat_ratio"]
+                # 목표 식단의 영양소 비율 가져오기
+                if goal_type not in goal_ratios:
+                    raise ValueError(f"'{goal_type}'은 유효하지 않은 목표 식단 타입입니다.")
+                ratios = goal_ratios[goal_type]
+                carb_ratio, protein_ratio, fat_ratio = ratios["carb_ratio"], ratios["protein_ratio"], ratios["fat_ratio"]
 
-        # 영양소 목표 계산
-        carb_target = round((target_tdee * carb_ratio) / 4, 2)  # g
-        protein_target = round((target_tdee * protein_ratio) / 4, 2)  # g
-        fat_target = round((target_tdee * fat_ratio) / 9, 2)  # g
+                # 영양소 목표 계산
+                carb_target = round((target_tdee * carb_ratio) / 4, 2)  # g
+                protein_target = round((target_tdee * protein_ratio) / 4, 2)  # g
+                fat_target = round((target_tdee * fat_ratio) / 9, 2)  # g
 
-        # 식단 추천 (목표 TDEE 기준)
-        recommended_diet = recommend_diet(target_tdee, food_data, carb_target, protein_target, fat_target)
+            with trace.stage("recommend"):
+                # 식단 추천 (목표 TDEE 기준)
+                recommended_diet = recommend_diet(target_tdee, catalog, carb_target, protein_target, fat_target)
 
         return {
             "user_info": {
@@ -297,9 +320,40 @@ def get_custom_diet(user_info):
             },
             "recommended_diet": recommended_diet
         }
+    except UserInfoValidationError:
+        raise
     except Exception as e:
         raise ValueError(f"Error processing user data: {e}")
 
+def _init_diet_worker(catalog_dir):
+    global shared_catalog
+    # fork 된 워커는 부모의 NumPy 난수 상태를 그대로 물려받으므로 워커마다 다시 시드
+    np.random.seed()
+    shared_catalog = SharedCatalogReader(catalog_dir)
+
+def create_diet_pool(processes=None, catalog_dir=None):
+    """
+    get_custom_diet 병렬 실행용 프로세스 풀 생성
+    - 게시된 세대가 없을 때만 현재 카탈로그를 게시하고, 있으면 그 세대에 attach (풀마다 세대를 올리지 않음)
+    - 워커는 DB 조회 없이 attach, 이후 같은 디렉토리에 publish_catalog 하면 워커 재시작 없이 새 카탈로그 사용
+    """
+    if shared_catalog is not None:
+        catalog_dir = shared_catalog.catalog_dir
+    else:
+        catalog_dir = catalog_dir or default_catalog_dir()
+        publish_catalog(catalog, catalog_dir, if_missing=True)
+    # spawn 방식 워커가 이 모듈을 import 할 때도 DB 대신 공유 카탈로그를 사용하도록
+    # 워커 시작 동안만 FOOD_CATALOG_DIR 설정 (이후 실행하는 다른 프로세스에는 전달하지 않음)
+    previous = os.environ.get('FOOD_CATALOG_DIR')
+    os.environ['FOOD_CATALOG_DIR'] = catalog_dir
+    try:
+        return multiprocessing.Pool(processes, initializer=_init_diet_worker, initargs=(catalog_dir,))
+    finally:
+        if previous is None:
+            os.environ.pop('FOOD_CATALOG_DIR', None)
+        else:
+            os.environ['FOOD_CATALOG_DIR'] = previous
+
 
 # sys.argv[1]로 Node.js에서 전달된 JSON 문자열 접근
 if __name__ == "__main__":
@@ -307,7 +361,7 @@ if __name__ == "__main__":
         user_info = json.loads(sys.argv[1].encode('utf-8').decode('utf-8'))  # Node.js에서 전달받은 JSON 데이터
         sys.stderr.write(f"Received user data: {user_info}\n")  # 디버깅 메시지
         result = get_custom_diet(user_info)
-        print(json.dumps(result, ensure_ascii=False))  # 결과 JSON 출력
+        print(dumps_json(result))  # 결과 JSON 출력
         sys.exit(0)
     except Exception as e:
         print(json.dumps({"error": str(e)}, ensure_ascii=False))  # 오류 JSON 출력
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+BMI / BMR / TDEE 계산 (foodRecommendation, 벤치마크/부하 테스트 스크립트 공용)
+"""
+
+# 활동 수준별 TDEE 계수
+activity_level_mapping = {
+    1: 1.2,    # 거의 활동 없음
+    2: 1.375,  # 가벼운 활동
+    3: 1.55,   # 보통 활동
+    4: 1.725,  # 매우 활동적
+}
+
+# BMI 계산 함수
+def calculate_bmi(weight, height):
+    """
+    BMI 계산 및 상태 반환
+    """
+    bmi = weight / ((height / 100) ** 2)  # 키를 cm에서 m로 변환하여 계산
+    if bmi < 18.5:
+        return '저체중', bmi
+    elif 18.5 <= bmi < 23:
+        return '정상체중', bmi
+    elif 23 <= bmi < 25:
+        return '과체중', bmi
+    else:
+        return '비만', bmi
+
+# BMR 계산 함수 (Harris-Benedict 공식)
+def calculate_bmr(weight, height, age, gender):
+    """
+    BMR(기초대사량) 계산
+    """
+    if gender == 'Male':
+        return 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
+    elif gender == 'Female':
+        return 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
+    else:
+        raise ValueError("성별은 'Male' 또는 'Female'로 입력해야 합니다.")
+
+# TDEE 계산 함수
+def calculate_tdee(bmr, activity_level):
+    """
+    TDEE(Total Daily Energy Expenditure) 계산 함수
+    """
+    if activity_level not in activity_level_mapping:
+        raise ValueError("활동 수준은 1~4 사이의 정수여야 합니다.")
+
+    activity_coefficient = activity_level_mapping[activity_level]
+    return bmr * activity_coefficient
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+예측 / 식단 추천 부하 테스트
+
+- Data/DB/*.sql MySQL 덤프로 로컬 SQLite 를 만들어 foodRecommendation 이 MySQL 대신 사용 (DATABASE_URL)
+- 덤프 사용자 + Data/gender.csv 기반 합성 사용자로 요청 mix 구성
+- 목표 RPS 의 open-loop(Poisson) 도착으로 요청을 보내고, 지연은 예정 도착 시각부터 측정 (대기 시간 포함)
+- 실행 모드
+    inprocess: model_predict.predict / foodRecommendation.get_custom_diet 직접 호출
+    bridge   : Node predictController 처럼 요청마다 Python 프로세스 실행 (stdin / argv JSON)
+- 결과: 대상별 지연 백분위수, 오류율, 저하 응답 비율, 시간별 CPU/RSS (하네스 프로세스 + 자식 프로세스별)
+- 저하(degraded) 응답: 오류 없이 끝났지만 식사 추천 대신 {"message": ...} 만 반환한 식단 응답
+  (예: 카탈로그에 밥류/반찬류가 없는 경우), --strict 이면 저하 응답이 있을 때 종료 코드 1
+
+실행 (src/python 디렉토리에서):
+    python load_test.py --rps 20 --duration 30 --mix predict=0.3 diet=0.7 --mode bridge --output load_report.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from profile_samples import sample_people, synthetic_profiles
+from user_schema import BODY_PARTS
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+dump_dir = os.path.join(current_dir, "..", "..", "Data", "DB")
+
+# bridge 모드에서 실행 중인 자식 프로세스 {pid: 대상 이름} (ResourceSampler 가 pid 별 RSS 기록)
+live_children = {}
+live_children_lock = threading.Lock()
+
+# MySQL 덤프 파싱
+value_pattern = re.compile(r"'((?:[^'\\]|\\.)*)'|(NULL)|(-?\d+\.\d+)|(-?\d+)|([()])")
+mysql_escapes = {"0": "\0", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"}
+
+def _unescape(value):
+    return re.sub(r"\\(.)", lambda m: mysql_escapes.get(m.group(1), m.group(1)), value)
+
+def parse_insert_values(values_text):
+    """
+    INSERT ... VALUES (...),(...); 의 값 부분을 행 튜플 리스트로 변환
+    """
+    rows = []
+    row = None
+    for match in value_pattern.finditer(values_text):
+        string, null, real, integer, paren = match.groups()
+        if paren == "(":
+            row = []
+        elif paren == ")":
+            rows.append(tuple(row))
+            row = None
+        elif row is None:
+            continue
+        elif string is not None:
+            row.append(_unescape(string))
+        elif null is not None:
+            row.append(None)
+        elif real is not None:
+            row.append(float(real))
+        else:
+            row.append(int(integer))
+    return rows
+
+def seed_sqlite(db_path, dump_paths):
+    """
+    MySQL 덤프의 CREATE TABLE 컬럼명과 INSERT 데이터로 SQLite DB 생성, {테이블: 행 수} 반환
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    connection = sqlite3.connect(db_path)
+    counts = {}
+    try:
+        for path in dump_paths:
+            table = None  # CREATE TABLE 블록 안에서만 설정
+            columns = []
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    create = re.match(r"CREATE TABLE `(\w+)`", line)
+                    if create:
+                        table, columns = create.group(1), []
+                        continue
+                    if table:
+                        column = re.match(r"\s+`(\w+)`\s", line)
+                        if column:
+                            columns.append(column.group(1))
+                        elif line.startswith(")"):
+                            connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+                            connection.execute(f'CREATE TABLE "{table}" ({", ".join(columns)})')
+                            table = None
+                        continue
+                    insert = re.match(r"INSERT INTO `(\w+)` VALUES (.*)", line)
+                    if insert:
+                        name = insert.group(1)
+                        rows = parse_insert_values(insert.group(2))
+                        if rows:
+                            placeholders = ", ".join("?" * len(rows[0]))
+                            connection.executemany(f'INSERT INTO "{name}" VALUES ({placeholders})', rows)
+                        counts[name] = counts.get(name, 0) + len(rows)
+        connection.commit()
+    finally:
+        connection.close()
+    return counts
+
+# 사용자 mix 구성
+def dump_users(db_path, rng):
+    """
+    덤프의 users + user_physical_info 를 요청 입력 형태로 변환 (선호 부위는 rng 로 샘플링)
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        rows = connection.execute("""
+            SELECT u.username, p.current_weight, p.target_weight, p.height, p.age, p.gender,
+                   p.activity_level, p.goal_type, p.basal_metabolic_rate, p.active_metabolic_rate, p.bmi
+            FROM user_physical_info p JOIN users u ON u.id = p.user_id
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        connection.close()
+
+    users = []
+    for (username, current_weight, target_weight, height, age, gender,
+         activity_level, goal_type, bmr, tdee, bmi) in rows:
+        users.append({
+            "username": username,
+            "age": age,
+            "height": height,
+            "current_weight": current_weight,
+            "target_weight": target_weight,
+            "bmr": bmr,
+            "tdee": tdee,  # Node 컨트롤러와 동일하게 amr 을 tdee 로 사용
+            "bmi": bmi,
+            "target_bmi": target_weight / ((height / 100) ** 2),
+            "activity_level": activity_level,
+            "gender": gender,
+            "goal_type": goal_type,
+            "preferred_body_part": str(rng.choice(BODY_PARTS)),
+        })
+    return users
+
+def synthetic_users(n_users, rng):
+    """
+    gender.csv 신체 정보로 합성 사용자 생성 (profile_samples 공용 생성기 사용)
+    """
+    frame = synthetic_profiles(sample_people(n_users, rng), rng, prefix="loadtest")
+    frame = frame.round({"height": 1, "current_weight": 1, "target_weight": 1, "bmr": 2, "tdee": 2, "bmi": 1, "target_bmi": 1})
+    return json.loads(frame.to_json(orient="records", force_ascii=False))
+
+def corrupt(user_info, rng):
+    """
+    잘못된 입력 요청 생성 (검증 오류 경로 측정용)
+    """
+    user_info = dict(user_info)
+    field, value = rng.choice([("activity_level", 5), ("height", "abc"), ("gender", "M"), ("age", None)])
+    user_info[field] = value
+    return user_info
+
+# 요청 실행 대상
+def make_target(name, mode, env):
+    """
+    대상 이름/모드에 맞는 요청 함수 반환 (성공 시 (결과, 자식 자원 사용량), 실패 시 예외)
+    """
+    if mode == "inprocess":
+        if name == "predict":
+            import model_predict
+            func = model_predict.predict
+        else:
+            import foodRecommendation
+            func = foodRecommendation.get_custom_diet
+        return lambda user_info: (func(user_info), None)
+
+    def run_bridge(user_info):
+        payload = json.dumps(user_info, ensure_ascii=False)
+        if name == "predict":
+            # predictUtils.js: stdin 으로 JSON 전달
+            command = [sys.executable, "model_predict.py"]
+            stdin = payload
+        else:
+            # foodRecommendation.py: argv[1] 로 JSON 전달
+            command = [sys.executable, "foodRecommendation.py", payload]
+            stdin = None
+        returncode, stdout, stderr, child = run_child(name, command, stdin, env)
+        if returncode != 0:
+            raise ChildError((stderr or stdout).strip()[-500:], child)
+        return json.loads(stdout), child
+    return run_bridge
+
+class ChildError(RuntimeError):
+    """
+    bridge 자식 프로세스 실패 (child: 자식 프로세스 자원 사용량)
+    """
+    def __init__(self, message, child):
+        super().__init__(message)
+        self.child = child
+
+def run_child(name, command, stdin, env):
+    """
+    자식 프로세스 실행 후 (종료 코드, stdout, stderr, 자원 사용량) 반환
+    - os.wait4 로 직접 회수해 해당 pid 의 CPU 시간 / 최대 RSS 기록
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=out, stderr=err,
+                                   cwd=current_dir, env=env)
+        with live_children_lock:
+            live_children[process.pid] = name
+        try:
+            try:
+                process.stdin.write((stdin or "").encode('utf-8'))
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        finally:
+            with live_children_lock:
+                live_children.pop(process.pid, None)
+        out.seek(0)
+        err.seek(0)
+        child = {
+            "pid": process.pid,
+            "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+            "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # Linux ru_maxrss 단위는 KB
+        }
+        return (process.returncode, out.read().decode('utf-8', 'replace'),
+                err.read().decode('utf-8', 'replace'), child)
+
+def degraded_meals(result):
+    """
+    식단 응답에서 추천 대신 message 만 반환된 식사 목록
+    """
+    if not isinstance(result, dict):
+        return []
+    diet = result.get("recommended_diet") or {}
+    return [meal for meal, value in diet.items() if isinstance(value, dict) and set(value) == {"message"}]
+
+def catalog_coverage():
+    """
+    foodRecommendation 카탈로그의 분류별 음식 수, 일반 식사에 필요한 밥류/반찬류가 없으면 경고
+    """
+    import foodRecommendation
+    categories, counts = np.unique(foodRecommendation.get_catalog()['category'], return_counts=True)
+    coverage = {str(category): int(count) for category, count in zip(categories, counts)}
+    missing = [category for category in ("밥류", "반찬류") if not coverage.get(category)]
+    if missing:
+        print(f"WARNING: food catalog has no {missing} items; breakfast/lunch/dinner will only return "
+              f"a message (catalog categories: {coverage})", file=sys.stderr)
+    return coverage, missing
+
+# 리소스 샘플링
+class ResourceSampler:
+    """
+    주기적으로 하네스 프로세스와 자식 프로세스의 CPU/RSS 기록
+    - 자식 CPU 는 종료된(회수된) 자식 누적 시간 기준이라 요청별 단명 프로세스도 포함됨
+    - 자식 RSS 는 샘플 시점에 실행 중인 bridge 자식별 값 (요청별 최대 RSS 는 run_child 결과에 기록)
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _rss_mb(self):
+        try:
+            with open("/proc/self/statm") as f:
+                return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6, 1)
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _children_rss_mb(self):
+        """
+        실행 중인 자식 프로세스별 현재 RSS {pid: MB} (/proc/<pid>/status 의 VmRSS)
+        """
+        with live_children_lock:
+            pids = list(live_children)
+        children = {}
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            children[str(pid)] = round(int(line.split()[1]) / 1024, 1)  # KB
+                            break
+            except (OSError, ValueError):
+                pass  # 이미 종료된 프로세스
+        return children
+
+    def _run(self):
+        start = time.perf_counter()
+        last_wall, last = start, os.times()
+        while not self._stop.wait(self.interval):
+            now, times = time.perf_counter(), os.times()
+            wall = now - last_wall
+            children = self._children_rss_mb()
+            self.samples.append({
+                "t": round(now - start, 2),
+                "cpu_percent": round(max((times.user + times.system - last.user - last.system) / wall * 100, 0.0), 1),
+                "children_cpu_percent": round(max(
+                    (times.children_user + times.children_system - last.children_user - last.children_system) / wall * 100, 0.0), 1),
+                "rss_mb": self._rss_mb(),
+                "children_rss_mb": round(sum(children.values()), 1),
+                "children": children,
+            })
+            last_wall, last = now, times
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+# 부하 실행
+def run_load(targets, mix, users, rps, duration, invalid_ratio, max_workers, seed=42):
+    """
+    open-loop Poisson 도착으로 요청 실행 후 요청별 결과 리스트 반환
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    # 도착 시각을 미리 정해 두고 응답과 무관하게 전송 (coordinated omission 방지)
+    arrivals = []
+    t = rng.expovariate(rps)
+    while t < duration:
+        arrivals.append(t)
+        t += rng.expovariate(rps)
+
+    results = []
+
+    def execute(name, user_info, invalid, scheduled):
+        started = time.perf_counter()
+        error = None
+        degraded = []
+        child = None
+        try:
+            result, child = targets[name](user_info)
+            degraded = degraded_meals(result)
+        except BaseException as e:  # 대상의 sys.exit 도 오류로 기록
+            error = f"{type(e).__name__}: {str(e)[:200]}"
+            child = getattr(e, "child", None)
+        finished = time.perf_counter()
+        results.append({
+            "target": name,
+            "invalid_input": invalid,
+            "latency_ms": (finished - scheduled) * 1000,
+            "service_ms": (finished - started) * 1000,
+            "error": error,
+            "degraded_meals": degraded,
+            "child": child,
+        })
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        t0 = time.perf_counter()
+        for offset in arrivals:
+            scheduled = t0 + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name = rng.choices(names, weights)[0]
+            user_info = rng.choice(users)
+            invalid = rng.random() < invalid_ratio
+            executor.submit(execute, name, corrupt(user_info, rng) if invalid else user_info, invalid, scheduled)
+    return results
+
+def summarize(results, duration):
+    """
+    대상별 지연 백분위수 / 오류율 / 저하 응답 / 자식 프로세스 자원 요약
+    """
+    summary = {}
+    for name in sorted({r["target"] for r in results}) + ["all"]:
+        subset = [r for r in results if name == "all" or r["target"] == name]
+        valid = [r for r in subset if not r["invalid_input"]]
+        invalid = [r for r in subset if r["invalid_input"]]
+        latencies = np.array([r["latency_ms"] for r in valid]) if valid else np.zeros(1)
+        service = np.array([r["service_ms"] for r in valid]) if valid else np.zeros(1)
+        errors = [r for r in valid if r["error"]]
+        degraded = [r for r in valid if r["degraded_meals"]]
+        children = [r["child"] for r in subset if r["child"]]
+        summary[name] = {
+            "requests": len(subset),
+            "achieved_rps": round(len(subset) / duration, 2),
+            "error_rate": round(len(errors) / len(valid), 4) if valid else None,
+            # 오류 없이 message 만 반환한 식사가 있는 응답 비율
+            "degraded_rate": round(len(degraded) / len(valid), 4) if valid else None,
+            "degraded_meals": dict(Counter(meal for r in degraded for meal in r["degraded_meals"])),
+            # 잘못된 입력은 오류로 거절되어야 정상
+            "invalid_rejected_rate": round(sum(1 for r in invalid if r["error"]) / len(invalid), 4) if invalid else None,
+            "latency_ms": {
+                f"p{p}": round(float(np.percentile(latencies, p)), 2) for p in (50, 90, 95, 99)
+            } | {"max": round(float(latencies.max()), 2)},
+            "service_ms_p50": round(float(np.percentile(service, 50)), 2),
+            "sample_errors": sorted({r["error"] for r in errors})[:5],
+            # bridge 모드 요청별 자식 프로세스 (wait4 기준)
+            "child_peak_rss_mb": {
+                "p50": round(float(np.percentile([c["peak_rss_mb"] for c in children], 50)), 1),
+                "max": max(c["peak_rss_mb"] for c in children),
+            } if children else None,
+            "child_cpu_s_mean": round(float(np.mean([c["cpu_s"] for c in children])), 3) if children else None,
+        }
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="예측/식단 추천 open-loop 부하 테스트")
+    parser.add_argument("--rps", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="초")
+    parser.add_argument("--mix", nargs="+", default=["predict=0.5", "diet=0.5"], help="대상=비율")
+    parser.add_argument("--mode", choices=["inprocess", "bridge"], default="inprocess")
+    parser.add_argument("--users", type=int, default=500, help="합성 사용자 수")
+    parser.add_argument("--invalid-ratio", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=32, help="동시 실행 스레드 수")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="CPU/RSS 샘플링 주기(초)")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "diet_loadtest.sqlite"))
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--strict", action="store_true", help="저하 응답/카탈로그 분류 누락 시 종료 코드 1")
+    args = parser.parse_args()
+
+    mix = {}
+    for item in args.mix:
+        name, _, weight = item.partition("=")
+        if name not in ("predict", "diet"):
+            parser.error(f"unknown target '{name}'")
+        mix[name] = float(weight or 1)
+
+    # 로컬 SQLite 준비 후 foodRecommendation 이 MySQL 대신 사용하도록 설정
+    dump_paths = sorted(
+        os.path.join(dump_dir, name) for name in os.listdir(dump_dir) if name.endswith(".sql")
+    )
+    seeded = seed_sqlite(args.db, dump_paths)
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    print(f"Seeded {args.db}: {seeded}", file=sys.stderr)
+
+    profile_rng = np.random.default_rng(42)
+    users = dump_users(args.db, profile_rng) + synthetic_users(args.users, profile_rng)
+
+    # 모델/데이터 경로가 src/python 기준 상대 경로이므로 작업 디렉토리 고정
+    os.chdir(current_dir)
+    targets = {name: make_target(name, args.mode, dict(os.environ)) for name in mix}
+    coverage, missing = catalog_coverage() if "diet" in mix else (None, [])
+
+    sampler = ResourceSampler(args.sample_interval)
+    sampler.start()
+    started = time.perf_counter()
+    results = run_load(targets, mix, users, args.rps, args.duration, args.invalid_ratio, args.workers)
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+
+    report = {
+        "config": {
+            "rps": args.rps, "duration": args.duration, "mix": mix, "mode": args.mode,
+            "users": len(users), "invalid_ratio": args.invalid_ratio, "workers": args.workers,
+        },
+        "catalog_categories": coverage,
+        "elapsed_s": round(elapsed, 2),
+        "summary": summarize(results, elapsed),
+        "resources": sampler.samples,
+    }
+
+    print(json.dumps(report["summary"], ensure_ascii=False, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+    degraded_rate = report["summary"]["all"]["degraded_rate"]
+    if degraded_rate:
+        print(f"WARNING: {degraded_rate:.1%} of valid responses were degraded "
+              f"(meals: {report['summary']['all']['degraded_meals']})", file=sys.stderr)
+    if args.strict and (degraded_rate or missing):
+        sys.exit(1)
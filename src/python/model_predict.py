@@ -7,6 +7,11 @@ import torch
 import torch.nn as nn
 from joblib import load
 import traceback
+from optimized_inference import prepare_model
+from request_profiler import RequestProfiler
+from user_schema import (
+    PREDICT_FIELDS, UserInfoValidationError, validate_user_info, validate_user_batch, raise_for_batch_errors
+)
 
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -52,42 +57,84 @@ model = FeedforwardNNImproved(input_dim, hidden_layer_sizes)
 model.load_state_dict(torch.load(model_path))
 model.eval()
 
-def predict(user_info):
-    input_data = pd.DataFrame([{
-        "Age": user_info["age"],
-        "Height": user_info["height"] / 100,  # cm → m
-        "Weight": user_info["current_weight"],
-        "TargetWeight": user_info["target_weight"],
-        "BMR": user_info["bmr"],
-        "TDEE": user_info["tdee"],
-        "BMI": user_info["bmi"],
-        "TargetBMI": user_info["target_bmi"],
-        "Calorie_Target": user_info["tdee"] - 500, 
+# 추론 모드 설정 (PREDICT_OPTIMIZED / PREDICT_NUM_THREADS / PREDICT_NUM_INTEROP_THREADS)
+model = prepare_model(model, input_dim, model_path)
+
+# 느린 요청 프로파일링 (PROFILE_SLOW_MS 설정 시 활성화)
+profiler = RequestProfiler.from_env("predict")
+
+def build_features(columns):
+    """
+    검증된 입력 컬럼(dict: 필드 -> 값 리스트/배열)을 스케일링된 모델 입력 배열로 변환
+    """
+    tdee = np.asarray(columns["tdee"], dtype=np.float64)
+    input_data = pd.DataFrame({
+        "Age": columns["age"],
+        "Height": np.asarray(columns["height"], dtype=np.float64) / 100,  # cm → m
+        "Weight": columns["current_weight"],
+        "TargetWeight": columns["target_weight"],
+        "BMR": columns["bmr"],
+        "TDEE": tdee,
+        "BMI": columns["bmi"],
+        "TargetBMI": columns["target_bmi"],
+        "Calorie_Target": tdee - 500,
         "Calorie_Deficit": 500,
         "총 운동시간": 120,
         "하루소모칼로리": 400,
         "총 식사섭취 칼로리": 2000,
-        "ActivityLevel": user_info["activity_level"],
-        "Gender": user_info["gender"],
-        "GoalType": user_info["goal_type"],
-        "preferred_body_part": user_info["preferred_body_part"]
-    }])
+        "ActivityLevel": columns["activity_level"],
+        "Gender": columns["gender"],
+        "GoalType": columns["goal_type"],
+        "preferred_body_part": columns["preferred_body_part"]
+    })
 
     categorical_features = ['Gender', 'GoalType', 'preferred_body_part']
     input_data = pd.get_dummies(input_data, columns=categorical_features)
     input_data = input_data.reindex(columns=expected_columns, fill_value=0)
 
     # Data scaling
-    X_input = scaler.transform(input_data)
+    return scaler.transform(input_data)
 
-    # Model predict
-    with torch.no_grad():
-        X_tensor = torch.tensor(X_input, dtype=torch.float32)
-        prediction = model(X_tensor).item()
-        days_to_goal = np.expm1(prediction)
+def predict(user_info):
+    # stdin JSON 이 객체가 아닐 수 있으므로 크기 계산 전에 타입 확인 (검증은 validate 단계에서)
+    fields = len(user_info) if isinstance(user_info, dict) else None
+    with profiler.profile(input_size={"rows": 1, "fields": fields}) as trace:
+        with trace.stage("validate"):
+            values = validate_user_info(user_info, PREDICT_FIELDS)
+
+        with trace.stage("preprocess"):
+            X_input = build_features({field: [value] for field, value in values.items()})
+
+        with trace.stage("inference"):
+            # Model predict
+            with torch.no_grad():
+                X_tensor = torch.tensor(X_input, dtype=torch.float32)
+                prediction = model(X_tensor).item()
+                days_to_goal = np.expm1(prediction)
 
     return days_to_goal
 
+def predict_batch(user_frame):
+    """
+    신뢰된 배치 입력(DataFrame 또는 컬럼 dict) 일괄 예측, 목표 달성 일수 배열 반환
+    - 검증은 컬럼 단위로 한 번에 수행하고 잘못된 행이 있으면 UserInfoValidationError
+    """
+    rows = len(user_frame) if isinstance(user_frame, pd.DataFrame) else None
+    with profiler.profile(input_size={"rows": rows}) as trace:
+        with trace.stage("validate"):
+            columns, errors = validate_user_batch(user_frame, PREDICT_FIELDS)
+            raise_for_batch_errors(errors)
+
+        with trace.stage("preprocess"):
+            X_input = build_features(columns)
+
+        with trace.stage("inference"):
+            with torch.no_grad():
+                X_tensor = torch.tensor(X_input, dtype=torch.float32)
+                predictions = model(X_tensor).squeeze(1).numpy()
+
+    return np.expm1(predictions)
+
 if __name__ == "__main__":
     try:
         # stdin
@@ -105,6 +152,14 @@ if __name__ == "__main__":
 
         print(json.dumps(result, ensure_ascii=False))  # ensure_ascii=False
 
+    except UserInfoValidationError as e:
+        # 입력 오류는 traceback 없이 필드별 메시지만 반환
+        print(json.dumps({
+            "error": str(e),
+            "fields": dict(e.errors)
+        }, ensure_ascii=False), file=sys.stderr)
+        sys.exit(1)
+
     except Exception as e:
         print(json.dumps({
             "error": str(e),
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import hashlib
+import torch
+import torch.nn as nn
+
+# 최적화 추론 모드 설정 (환경 변수)
+# PREDICT_OPTIMIZED=1          : 저장된 TorchScript trace/freeze 모델 사용 (정확도 기준을 통과한 경우 int8 동적 양자화 포함)
+# PREDICT_NUM_THREADS=N        : intra-op 스레드 수 (워커 여러 개 실행 시 1~2 권장)
+# PREDICT_NUM_INTEROP_THREADS=N: inter-op 스레드 수
+# PREDICT_OPTIMIZED_MODEL=path : 미리 저장한 최적화 모델 경로 (기본: <model_path>_optimized.pt)
+#
+# 최적화 모델은 요청마다 만들지 않고 benchmark_inference.py --save-optimized 로 한 번 저장해 두고
+# torch.jit.load 로 불러옴 (Node 가 요청마다 프로세스를 실행하므로 양자화/trace 비용이 매번 발생하지 않게)
+def load_inference_settings():
+    """
+    환경 변수에서 추론 설정을 읽어 반환
+    """
+    def _int_env(name):
+        value = os.getenv(name)
+        return int(value) if value else None
+
+    return {
+        "optimized": os.getenv("PREDICT_OPTIMIZED", "0").lower() in ("1", "true", "yes"),
+        "num_threads": _int_env("PREDICT_NUM_THREADS"),
+        "num_interop_threads": _int_env("PREDICT_NUM_INTEROP_THREADS"),
+        "optimized_path": os.getenv("PREDICT_OPTIMIZED_MODEL"),
+    }
+
+def optimized_model_path(model_path):
+    """
+    float 모델 경로에 대응하는 최적화 모델 저장 경로 (P_model.pth -> P_model_optimized.pt)
+    """
+    return os.path.splitext(model_path)[0] + "_optimized.pt"
+
+def _file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def configure_threads(num_threads=None, num_interop_threads=None):
+    """
+    torch intra-op / inter-op 스레드 수 설정
+    - inter-op 스레드는 병렬 작업이 시작되기 전에만 설정 가능하므로 모델 로드 직후 호출해야 함
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if num_interop_threads:
+        try:
+            torch.set_num_interop_threads(num_interop_threads)
+        except RuntimeError:
+            # 이미 inter-op 풀이 시작된 경우 (같은 프로세스에서 재설정 시도)
+            pass
+
+def optimize_model(model, input_dim, quantize=True):
+    """
+    추론 전용 모델 생성
+    - quantize=True 이면 Linear 레이어 int8 동적 양자화 (BatchNorm/LeakyReLU 는 float 유지)
+    - TorchScript trace 후 freeze (Dropout 제거, 상수 폴딩)
+    """
+    model.eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    example = torch.zeros(1, input_dim, dtype=torch.float32)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+    return torch.jit.freeze(traced.eval())
+
+def save_optimized_model(optimized, model_path, path=None):
+    """
+    optimize_model 결과를 torch.jit.save 로 저장하고 저장 경로 반환
+    - 원본 가중치 파일 해시를 함께 저장해 재학습 후 오래된 모델을 쓰지 않도록 함
+    """
+    path = path or optimized_model_path(model_path)
+    torch.jit.save(optimized, path, _extra_files={"source_sha256": _file_sha256(model_path)})
+    return path
+
+def load_optimized_model(model_path, path=None):
+    """
+    저장된 최적화 모델 로드, 파일이 없거나 원본 가중치와 맞지 않으면 None
+    """
+    path = path or optimized_model_path(model_path)
+    if not os.path.exists(path):
+        return None
+    extra_files = {"source_sha256": ""}
+    optimized = torch.jit.load(path, _extra_files=extra_files)
+    source_sha256 = extra_files["source_sha256"]
+    if isinstance(source_sha256, bytes):
+        source_sha256 = source_sha256.decode()
+    if source_sha256 != _file_sha256(model_path):
+        print(f"Optimized model {path} was built from different weights, ignoring it", file=sys.stderr)
+        return None
+    return optimized.eval()
+
+def prepare_model(model, input_dim, model_path, settings=None):
+    """
+    설정에 따라 스레드 수를 적용하고 float 모델 또는 최적화 모델을 반환
+    - 최적화 모델은 저장된 파일을 로드하고, 없을 때만 현재 프로세스에서 생성 (경고 출력)
+    - 현재 프로세스에서 생성할 때는 정확도 검증을 거치지 않았으므로 양자화하지 않음
+    """
+    if settings is None:
+        settings = load_inference_settings()
+    configure_threads(settings["num_threads"], settings["num_interop_threads"])
+    if not settings["optimized"]:
+        return model
+    optimized = load_optimized_model(model_path, settings["optimized_path"])
+    if optimized is None:
+        print("Optimized model not found; building it in-process "
+              "(run benchmark_inference.py --save-optimized to build it once)", file=sys.stderr)
+        optimized = optimize_model(model, input_dim, quantize=False)
+    return optimized
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Data/gender.csv 신체 정보 기반 합성 사용자 프로필 (벤치마크/부하 테스트 공용)
+
+- 키/몸무게/나이/성별은 gender.csv 값을 사용
+- 활동 수준 / 목표 체중 / 목표 식단 / 선호 부위는 주어진 rng 로 샘플링
+- BMR / TDEE / BMI 는 health_utils 계산 함수로 산출 (foodRecommendation 과 동일한 정의)
+"""
+import os
+import numpy as np
+import pandas as pd
+
+from health_utils import calculate_bmi, calculate_bmr, calculate_tdee
+from user_schema import BODY_PARTS, GOAL_TYPES
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+people_path = os.path.join(current_dir, "Data", "gender.csv")
+
+def load_people(path=people_path):
+    return pd.read_csv(path, encoding='utf-8')
+
+def sample_people(n_rows, rng, path=people_path):
+    """
+    gender.csv 에서 n_rows 행을 복원 추출
+    """
+    people = load_people(path)
+    return people.iloc[rng.integers(0, len(people), size=n_rows)].reset_index(drop=True)
+
+def synthetic_profiles(people, rng, prefix="user"):
+    """
+    people(gender.csv 형식) 각 행을 예측 입력 프로필로 변환한 DataFrame 반환 (PREDICT_FIELDS 컬럼)
+    """
+    n_rows = len(people)
+    height = people['Height'].to_numpy() * 100  # m -> cm
+    weight = people['Weight'].to_numpy()
+    age = people['Age'].to_numpy()
+    gender = people['Gender'].to_numpy()
+    activity_level = rng.integers(1, 5, size=n_rows)
+    target_weight = weight * rng.uniform(0.85, 1.05, size=n_rows)
+
+    bmr = np.array([calculate_bmr(w, h, a, g) for w, h, a, g in zip(weight, height, age, gender)])
+    tdee = np.array([calculate_tdee(b, int(level)) for b, level in zip(bmr, activity_level)])
+
+    return pd.DataFrame({
+        "username": [f"{prefix}{i}" for i in range(n_rows)],
+        "age": age,
+        "height": height,
+        "current_weight": weight,
+        "target_weight": target_weight,
+        "bmr": bmr,
+        "tdee": tdee,
+        "bmi": [calculate_bmi(w, h)[1] for w, h in zip(weight, height)],
+        "target_bmi": [calculate_bmi(w, h)[1] for w, h in zip(target_weight, height)],
+        "activity_level": activity_level,
+        "gender": gender,
+        "goal_type": rng.choice(GOAL_TYPES, size=n_rows),
+        "preferred_body_part": rng.choice(BODY_PARTS, size=n_rows),
+    })
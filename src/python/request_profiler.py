@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+느린 요청 프로파일링 훅 (opt-in)
+
+환경 변수:
+    PROFILE_SLOW_MS           : 이 값(ms)을 넘는 요청을 기록 (미설정 시 비활성화)
+    PROFILE_DIR               : 기록 디렉토리 (기본: <tmp>/diet_profiles)
+    PROFILE_SAMPLE_INTERVAL_MS: 스택 샘플링 주기(ms) (기본 10)
+    PROFILE_MIN_INTERVAL      : 기록 사이 최소 간격(초) (기본 1.0)
+    PROFILE_MAX_FILES         : 보관할 최대 기록 수, 초과 시 오래된 것부터 삭제 (기본 50)
+
+느린지 여부는 요청이 끝나야 알 수 있으므로, 실행 중인 모든 요청 스레드의 스택을
+데몬 스레드가 주기적으로 sys._current_frames() 로 샘플링하고, 임계값을 넘은 요청의
+샘플만 저장함 (나머지는 버림). 따라서 임계값을 넘은 요청은 모두 프로파일 대상이 되고,
+비용은 요청 수와 무관하게 샘플링 주기로 정해짐 (스레드당 주기마다 스택 한 번 순회).
+
+기록 형식: <name>_<시각>_<pid>_<id>.json (단계별 시간, 상위 함수) + .folded (flamegraph 용 접힌 스택)
+
+최소 간격은 기록 빈도만 제한하며, 마지막 기록 시각을 output_dir 의 표시 파일 mtime 으로
+보관하므로 요청마다 새 프로세스를 실행하는 Node 브리지 경로에서도 적용됨
+(프로세스 간에는 잠금 없이 비교하므로 동시에 끝난 요청은 간격 안에 함께 기록될 수 있음).
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+class RequestTrace:
+    """
+    요청 하나의 단계별 소요 시간 기록
+    """
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - start) * 1000, 3)
+
+class StackSampler:
+    """
+    등록된 스레드들의 호출 스택을 주기적으로 샘플링하는 데몬 스레드
+    - 스레드별 Counter{(바깥 -> 안쪽 프레임, ...): 샘플 수}
+    - 등록된 스레드가 없으면 대기하므로 유휴 비용 없음
+    """
+    def __init__(self, interval_ms=10):
+        self.interval = interval_ms / 1000
+        self._samples = {}  # thread id -> Counter
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._samples[thread_id] = Counter()
+            # fork 된 자식(Pool 워커 등)에는 샘플링 스레드가 없으므로 프로세스마다 시작
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="request-stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._samples.pop(thread_id, Counter())
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._samples:
+                    self._wakeup.clear()
+                thread_ids = [tid for tid in self._samples if tid != own_id]
+            if not thread_ids:
+                self._wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            stacks = {tid: _stack_key(frames[tid]) for tid in thread_ids if tid in frames}
+            del frames
+            with self._lock:
+                for tid, stack in stacks.items():
+                    if tid in self._samples:
+                        self._samples[tid][stack] += 1
+            time.sleep(self.interval)
+
+def _stack_key(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+class RequestProfiler:
+    def __init__(self, name, threshold_ms=None, output_dir=None, sample_interval_ms=10,
+                 min_interval=1.0, max_files=50):
+        self.name = name
+        self.threshold_ms = threshold_ms
+        self.output_dir = output_dir or os.path.join(tempfile.gettempdir(), "diet_profiles")
+        self.sample_interval_ms = sample_interval_ms
+        self.min_interval = min_interval
+        self.max_files = max_files
+        self._sampler = StackSampler(sample_interval_ms)
+        self._state_lock = threading.Lock()  # _last_written 확인/갱신
+
+    @classmethod
+    def from_env(cls, name):
+        """
+        환경 변수 설정으로 프로파일러 생성 (PROFILE_SLOW_MS 미설정 시 비활성)
+        """
+        threshold = os.getenv("PROFILE_SLOW_MS")
+        return cls(
+            name,
+            threshold_ms=float(threshold) if threshold else None,
+            output_dir=os.getenv("PROFILE_DIR"),
+            sample_interval_ms=float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "10")),
+            min_interval=float(os.getenv("PROFILE_MIN_INTERVAL", "1.0")),
+            max_files=int(os.getenv("PROFILE_MAX_FILES", "50")),
+        )
+
+    @property
+    def enabled(self):
+        return self.threshold_ms is not None
+
+    @property
+    def _marker_path(self):
+        # 마지막 기록 시각 (mtime) 표시 파일, 프로세스 간 공유
+        return os.path.join(self.output_dir, f".{self.name}_last_written")
+
+    @contextmanager
+    def profile(self, input_size=None):
+        """
+        요청 실행 구간을 감싸고 RequestTrace 를 반환
+        - 실행 중 스택을 샘플링하고, 임계값 초과 시 단계별 시간과 샘플을 output_dir 에 기록
+        """
+        trace = RequestTrace()
+        if not self.enabled:
+            yield trace
+            return
+
+        thread_id = threading.get_ident()
+        start = time.perf_counter()
+        self._sampler.start(thread_id)
+        try:
+            yield trace
+        finally:
+            samples = self._sampler.stop(thread_id)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self._write(elapsed_ms, trace, samples, input_size)
+
+    def _claim_write(self, now):
+        """
+        최소 간격이 지났으면 기록 시각을 갱신하고 True 반환
+        """
+        with self._state_lock:
+            try:
+                last_written = os.stat(self._marker_path).st_mtime
+            except FileNotFoundError:
+                last_written = 0.0
+            if now - last_written < self.min_interval:
+                return False
+            with open(self._marker_path, 'a'):
+                pass
+            os.utime(self._marker_path, (now, now))
+            return True
+
+    def _write(self, elapsed_ms, trace, samples, input_size):
+        now = time.time()
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            if not self._claim_write(now):
+                return
+
+            base = os.path.join(
+                self.output_dir,
+                f"{self.name}_{time.strftime('%Y%m%d-%H%M%S')}_{int(now * 1000) % 1000:03d}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+            )
+            if samples:
+                with open(base + ".folded", 'w', encoding='utf-8') as f:
+                    for stack, count in samples.most_common():
+                        f.write(f"{';'.join(stack)} {count}\n")
+            # 가장 안쪽 프레임 기준 샘플 수 (self time 근사)
+            leaf_counts = Counter()
+            for stack, count in samples.items():
+                leaf_counts[stack[-1]] += count
+            with open(base + ".json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    "name": self.name,
+                    "timestamp": now,
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "threshold_ms": self.threshold_ms,
+                    "input_size": input_size,
+                    "stages": trace.stages,
+                    "sample_interval_ms": self.sample_interval_ms,
+                    "samples": sum(samples.values()),
+                    "top_frames": [[frame, count] for frame, count in leaf_counts.most_common(10)],
+                    "profile": os.path.basename(base + ".folded") if samples else None,
+                }, f, ensure_ascii=False, indent=4)
+            self._rotate()
+        except OSError:
+            # 프로파일 기록 실패가 요청 처리에 영향을 주면 안 됨
+            pass
+
+    def _rotate(self):
+        """
+        최근 max_files 개 기록만 유지
+        """
+        records = sorted(
+            (entry for entry in os.scandir(self.output_dir)
+             if entry.name.startswith(self.name + "_") and entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in records[:max(len(records) - self.max_files, 0)]:
+            for path in (entry.path, entry.path[:-len(".json")] + ".folded"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
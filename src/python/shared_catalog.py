@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+분류된 음식 카탈로그 공유 (memory-mapped .npy)
+
+- publish_catalog: 카탈로그 배열을 새 세대(gen_XXXXXX) 디렉토리에 기록하고 generation 파일 갱신
+  (여러 프로세스가 동시에 게시해도 되도록 catalog_dir 의 잠금 파일로 직렬화, fcntl 이 없는 환경은 잠금 없음)
+- SharedCatalogReader: 최신 세대를 mmap 으로 zero-copy attach, generation 이 바뀌면 재attach
+
+여러 워커(Pool, FastAPI 워커 등)는 FOOD_CATALOG_DIR 환경 변수로 같은 디렉토리를 가리키면
+DB 조회/분류 없이 카탈로그를 공유하며, publish 만 다시 하면 재시작 없이 새 카탈로그로 교체됨.
+
+실행 (src/python 디렉토리에서, DB 에서 읽어 게시):
+    python shared_catalog.py --dir /dev/shm/food_catalog --interval 3600
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 카탈로그 배열 이름 (행 순서 = 음식 위치 인덱스)
+CATALOG_FIELDS = ["names", "category", "carbs", "protein", "fat", "macro_density"]
+
+generation_filename = "generation"
+lock_filename = "publish.lock"
+
+def default_catalog_dir():
+    """
+    기본 카탈로그 디렉토리 (/dev/shm 이 있으면 메모리 파일시스템 사용)
+    """
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "food_catalog")
+
+def build_macro_density(food_data):
+    """
+    kcal 당 섭취량/영양소 밀도 테이블 생성 (행 순서 = food_data 위치 인덱스)
+    - 칼로리 예산(kcal) x 밀도 = portion(g), carb/protein/fat(g), calories(kcal)
+    """
+    kcal = food_data['에너지(kcal)'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.column_stack([
+            100 / kcal,
+            food_data['탄수화물(g)'].to_numpy(dtype=np.float64) / kcal,
+            food_data['단백질(g)'].to_numpy(dtype=np.float64) / kcal,
+            food_data['지방(g)'].to_numpy(dtype=np.float64) / kcal,
+            np.ones(len(kcal)),
+        ])
+
+def build_catalog(food_data):
+    """
+    분류된 음식 DataFrame 을 카탈로그 배열 dict 로 변환 (문자열은 고정폭 유니코드 배열)
+    """
+    return {
+        "names": food_data['식품명'].to_numpy(dtype=str),
+        "category": food_data['음식분류'].to_numpy(dtype=str),
+        "carbs": food_data['탄수화물(g)'].to_numpy(dtype=np.float64),
+        "protein": food_data['단백질(g)'].to_numpy(dtype=np.float64),
+        "fat": food_data['지방(g)'].to_numpy(dtype=np.float64),
+        "macro_density": build_macro_density(food_data),
+    }
+
+def read_generation(catalog_dir):
+    """
+    현재 게시된 세대 번호 반환 (게시된 적 없으면 0)
+    """
+    try:
+        with open(os.path.join(catalog_dir, generation_filename), 'r') as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+def generation_dir(catalog_dir, generation):
+    return os.path.join(catalog_dir, f"gen_{generation:06d}")
+
+@contextmanager
+def publish_lock(catalog_dir):
+    """
+    catalog_dir 게시 잠금 (세대 번호 읽기 -> 기록 -> 갱신을 프로세스 간 직렬화)
+    """
+    with open(os.path.join(catalog_dir, lock_filename), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def publish_catalog(catalog, catalog_dir=None, keep=2, if_missing=False):
+    """
+    카탈로그를 새 세대로 게시하고 세대 번호 반환
+    - 고유한 임시 디렉토리에 세대를 먼저 완성한 뒤 generation 파일을 원자적으로 교체
+    - 최근 keep 개 세대만 남기고 삭제 (이미 mmap 한 워커는 삭제 후에도 기존 매핑 유지)
+    - if_missing=True 이면 이미 게시된 세대가 있을 때 새로 게시하지 않고 그 세대 번호 반환
+    """
+    catalog_dir = catalog_dir or default_catalog_dir()
+    os.makedirs(catalog_dir, exist_ok=True)
+
+    with publish_lock(catalog_dir):
+        current = read_generation(catalog_dir)
+        if if_missing and current and os.path.isdir(generation_dir(catalog_dir, current)):
+            return current
+
+        generation = current + 1
+        target_dir = generation_dir(catalog_dir, generation)
+        tmp_dir = tempfile.mkdtemp(prefix=f".gen_{generation:06d}.", dir=catalog_dir)
+        try:
+            for field in CATALOG_FIELDS:
+                np.save(os.path.join(tmp_dir, f"{field}.npy"), np.ascontiguousarray(catalog[field]))
+            # 이전 게시가 generation 갱신 전에 중단되어 남은 세대 디렉토리 정리
+            shutil.rmtree(target_dir, ignore_errors=True)
+            os.replace(tmp_dir, target_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        tmp_generation = os.path.join(catalog_dir, generation_filename + ".tmp")
+        with open(tmp_generation, 'w') as f:
+            f.write(str(generation))
+        os.replace(tmp_generation, os.path.join(catalog_dir, generation_filename))
+
+        for old in range(generation - keep, 0, -1):
+            old_dir = generation_dir(catalog_dir, old)
+            if not os.path.isdir(old_dir):
+                break
+            try:
+                shutil.rmtree(old_dir)
+            except OSError:
+                # Windows 등 매핑 중인 파일 삭제가 불가능한 환경
+                pass
+
+    return generation
+
+def load_generation(catalog_dir, generation):
+    """
+    지정 세대의 카탈로그 배열을 읽기 전용 mmap 으로 attach
+    """
+    target_dir = generation_dir(catalog_dir, generation)
+    return {
+        field: np.load(os.path.join(target_dir, f"{field}.npy"), mmap_mode='r')
+        for field in CATALOG_FIELDS
+    }
+
+class SharedCatalogReader:
+    """
+    게시된 카탈로그를 attach 하고 generation 변경 시 새 세대로 교체
+    """
+    def __init__(self, catalog_dir=None):
+        self.catalog_dir = catalog_dir or default_catalog_dir()
+        self.generation = None
+        self.catalog = None
+        self._stamp = None
+        if not self.refresh():
+            raise FileNotFoundError(f"No published food catalog in '{self.catalog_dir}'")
+
+    def refresh(self):
+        """
+        generation 파일이 바뀌었으면 새 세대로 교체 (stat 비교만 하므로 요청마다 호출 가능)
+        반환: 카탈로그가 attach 되어 있는지 여부
+        """
+        path = os.path.join(self.catalog_dir, generation_filename)
+        for _ in range(3):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return self.catalog is not None
+            stamp = (st.st_ino, st.st_mtime_ns)
+            if stamp == self._stamp:
+                return True
+
+            generation = read_generation(self.catalog_dir)
+            if generation == self.generation:
+                self._stamp = stamp
+                return True
+            try:
+                self.catalog = load_generation(self.catalog_dir, generation)
+            except FileNotFoundError:
+                # attach 도중 더 새로운 세대가 게시되어 이전 세대가 정리된 경우 재시도
+                continue
+            self.generation = generation
+            self._stamp = stamp
+            return True
+        return self.catalog is not None
+
+    def current(self):
+        self.refresh()
+        return self.catalog
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DB 음식 카탈로그를 공유 디렉토리에 게시")
+    parser.add_argument("--dir", default=default_catalog_dir())
+    parser.add_argument("--keep", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=0, help="0 보다 크면 해당 주기(초)로 DB 에서 다시 읽어 게시")
+    args = parser.parse_args()
+
+    # 게시하는 쪽은 항상 DB 에서 읽어야 하므로 공유 카탈로그 사용 해제
+    os.environ.pop("FOOD_CATALOG_DIR", None)
+    import foodRecommendation
+
+    catalog = foodRecommendation.catalog
+    while True:
+        generation = publish_catalog(catalog, args.dir, keep=args.keep)
+        print(f"Published food catalog generation {generation} to {args.dir}", file=sys.stderr)
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+        catalog = foodRecommendation.load_catalog()
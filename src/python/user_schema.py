@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+사용자 프로필 입력 검증/변환 (model_predict, foodRecommendation, APIcode 공용)
+
+- validate_user_info : 요청 1건(dict) 검증 및 타입 변환
+- validate_user_batch: 신뢰된 배치 입력을 컬럼 단위 NumPy 연산으로 한 번에 검증
+- user_profile_json_schema: 문서(OpenAPI)용 JSON Schema, 실제 검증은 위 함수들로만 수행
+"""
+import numpy as np
+import pandas as pd
+
+GENDERS = ("Male", "Female")
+GOAL_TYPES = ("저지방 고단백", "균형 식단", "벌크업")
+BODY_PARTS = ("가슴", "등", "어깨", "하체")
+
+# 필드별 규칙: type 은 float / int / str, 숫자는 (min, max) 범위, 문자열은 choices
+USER_PROFILE_SCHEMA = {
+    "username": {"type": "str"},
+    "age": {"type": "int", "range": (1, 120)},
+    "height": {"type": "float", "range": (50, 250)},  # cm
+    "current_weight": {"type": "float", "range": (20, 400)},  # kg
+    "target_weight": {"type": "float", "range": (20, 400)},  # kg
+    "bmr": {"type": "float", "range": (0, 10000)},
+    "tdee": {"type": "float", "range": (0, 20000)},
+    "bmi": {"type": "float", "range": (5, 100)},
+    "target_bmi": {"type": "float", "range": (5, 100)},
+    "activity_level": {"type": "int", "range": (1, 4)},
+    "gender": {"type": "str", "choices": GENDERS},
+    "goal_type": {"type": "str", "choices": GOAL_TYPES},
+    "preferred_body_part": {"type": "str", "choices": BODY_PARTS},
+}
+
+# 엔트리 포인트별 필수 필드
+PREDICT_FIELDS = (
+    "username", "age", "height", "current_weight", "target_weight", "bmr", "tdee",
+    "bmi", "target_bmi", "activity_level", "gender", "goal_type", "preferred_body_part",
+)
+DIET_FIELDS = (
+    "current_weight", "target_weight", "height", "age", "gender", "activity_level", "goal_type",
+)
+
+class UserInfoValidationError(ValueError):
+    """
+    입력 검증 실패 (errors: [(필드, 메시지), ...])
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(f"{field}: {message}" for field, message in errors))
+
+def _coerce_value(field, value):
+    rule = USER_PROFILE_SCHEMA[field]
+    if rule["type"] == "str":
+        if not isinstance(value, str):
+            raise ValueError("must be a string")
+        if "choices" in rule and value not in rule["choices"]:
+            raise ValueError(f"must be one of {list(rule['choices'])}")
+        return value
+
+    if isinstance(value, (bool, np.bool_)):
+        raise ValueError("must be a number")
+    try:
+        number = float(value)  # 숫자 문자열("72.5")도 허용
+    except (TypeError, ValueError):
+        raise ValueError("must be a number")
+    if not np.isfinite(number):
+        raise ValueError("must be a finite number")
+    if rule["type"] == "int":
+        if number != int(number):
+            raise ValueError("must be an integer")
+        number = int(number)
+    low, high = rule["range"]
+    if not low <= number <= high:
+        raise ValueError(f"must be between {low} and {high}")
+    return number
+
+def validate_user_info(user_info, fields=PREDICT_FIELDS):
+    """
+    요청 1건 검증 및 타입 변환 후 필요한 필드만 담은 dict 반환
+    - 모든 필드 오류를 모아 UserInfoValidationError 로 한 번에 보고
+    """
+    if not isinstance(user_info, dict):
+        raise UserInfoValidationError([("user_info", "must be a JSON object")])
+
+    values = {}
+    errors = []
+    for field in fields:
+        if user_info.get(field) is None:
+            errors.append((field, "is required"))
+            continue
+        try:
+            values[field] = _coerce_value(field, user_info[field])
+        except ValueError as e:
+            errors.append((field, str(e)))
+    if errors:
+        raise UserInfoValidationError(errors)
+    return values
+
+def user_profile_json_schema(fields=PREDICT_FIELDS):
+    """
+    USER_PROFILE_SCHEMA 규칙을 JSON Schema(object)로 변환 (숫자 필드는 숫자 문자열도 허용)
+    """
+    json_types = {"float": "number", "int": "integer"}
+    properties = {}
+    for field in fields:
+        rule = USER_PROFILE_SCHEMA[field]
+        if rule["type"] == "str":
+            prop = {"type": "string"}
+            if "choices" in rule:
+                prop["enum"] = list(rule["choices"])
+        else:
+            low, high = rule["range"]
+            prop = {"type": json_types[rule["type"]], "minimum": low, "maximum": high}
+        properties[field] = prop
+    return {"type": "object", "properties": properties, "required": list(fields)}
+
+def validate_user_batch(data, fields=PREDICT_FIELDS):
+    """
+    신뢰된 배치 입력(DataFrame 또는 컬럼 dict) 컬럼 단위 검증
+    반환: (변환된 컬럼 dict, 오류 dict {필드: 잘못된 행 위치 배열})
+    - 숫자 컬럼은 float64 배열 하나로 변환 후 범위/정수 여부를 벡터 연산으로 검사
+    - 문자열 컬럼은 np.isin 으로 허용값 검사
+    """
+    columns = {}
+    errors = {}
+    n_rows = None
+    for field in fields:
+        if field not in data:
+            raise UserInfoValidationError([(field, "column is required")])
+        column = data[field]
+        rule = USER_PROFILE_SCHEMA[field]
+        if np.ndim(column) != 1:
+            raise UserInfoValidationError([(field, "column must be a 1-D sequence")])
+
+        if rule["type"] == "str":
+            values = np.asarray(column, dtype=object)
+            if "choices" in rule:
+                invalid = ~np.isin(values, np.asarray(rule["choices"], dtype=object))
+            else:
+                invalid = np.fromiter((not isinstance(v, str) for v in values), dtype=bool, count=len(values))
+        else:
+            # bool 은 float 변환 시 1.0/0.0 이 되므로 validate_user_info 와 같이 숫자로 인정하지 않음
+            raw = np.asarray(column)
+            if raw.dtype == bool:
+                is_bool = np.ones(len(raw), dtype=bool)
+            elif raw.dtype == object:
+                is_bool = np.fromiter((isinstance(v, (bool, np.bool_)) for v in raw), dtype=bool, count=len(raw))
+            else:
+                is_bool = np.zeros(len(raw), dtype=bool)
+            try:
+                values = raw.astype(np.float64)
+            except (TypeError, ValueError):
+                values = pd.to_numeric(pd.Series(raw), errors='coerce').to_numpy(dtype=np.float64)
+            low, high = rule["range"]
+            with np.errstate(invalid='ignore'):
+                invalid = ~((values >= low) & (values <= high)) | is_bool  # NaN 도 여기서 걸러짐
+            if rule["type"] == "int":
+                with np.errstate(invalid='ignore'):
+                    invalid |= values != np.floor(values)
+                values = np.where(invalid, 0, values).astype(np.int64)
+
+        if n_rows is None:
+            n_rows = len(values)
+        elif len(values) != n_rows:
+            raise UserInfoValidationError([(field, f"column length {len(values)} != {n_rows}")])
+
+        columns[field] = values
+        if invalid.any():
+            errors[field] = np.flatnonzero(invalid)
+    return columns, errors
+
+def raise_for_batch_errors(errors, max_rows=5):
+    """
+    validate_user_batch 오류를 UserInfoValidationError 로 변환 (필드별 최대 max_rows 행 표시)
+    """
+    if errors:
+        raise UserInfoValidationError([
+            (field, f"invalid value at rows {rows[:max_rows].tolist()}" + (f" and {len(rows) - max_rows} more" if len(rows) > max_rows else ""))
+            for field, rows in errors.items()
+        ])